@@ -4,7 +4,14 @@ FastAPI application for the conversational AI system.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from config import REDIS_URL
+from models.llm_factory import (
+    close_http_clients,
+    close_shared_llms,
+    warm_http_clients,
+)
 from routers import chat
 
 # Create FastAPI application
@@ -12,6 +19,7 @@ app = FastAPI(
     title="Conversational AI MCP",
     description="Model Control Plane for Conversational AI",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -27,6 +35,22 @@ app.add_middleware(
 app.include_router(chat.router, prefix="/api", tags=["chat"])
 
 
+@app.on_event("startup")
+async def startup():
+    """Pre-establish connections to provider APIs."""
+    await warm_http_clients()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close sessions, shared LLMs and provider HTTP clients, and the session store."""
+    await chat.close_sessions()
+    await close_shared_llms()
+    await close_http_clients()
+    if chat.session_store is not None:
+        await chat.session_store.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -38,6 +62,18 @@ async def root():
 
 
 if __name__ == "__main__":
+    import os
+
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Without Redis, sessions live in process memory and need a single worker
+    default_workers = min(4, os.cpu_count() or 1) if REDIS_URL else 1
+    uvicorn.run(
+        "app:app",
+        host=os.getenv("BACKEND_HOST", "0.0.0.0"),
+        port=int(os.getenv("BACKEND_PORT", "8000")),
+        loop="auto",
+        http="httptools",
+        workers=int(os.getenv("BACKEND_WORKERS", default_workers)),
+        log_level="warning",
+    )
@@ -2,6 +2,7 @@
 Configuration settings for the conversational AI application.
 """
 
+import os
 from enum import Enum
 from typing import Dict, Optional
 
@@ -72,3 +73,15 @@ AVAILABLE_MODELS = {
 
 # Default system prompt for the conversational AI
 DEFAULT_SYSTEM_PROMPT = """You are a helpful, friendly AI assistant. Answer the user's questions to the best of your ability."""
+
+# Number of most recent user/assistant turns sent to the model
+MAX_CONVERSATION_TURNS = 20
+
+# Limits for in-memory conversation sessions
+MAX_SESSIONS = 1000
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TIMEOUT_MINUTES", "60")) * 60
+
+# Redis URL for sessions shared between workers, in-memory only if unset
+REDIS_URL = os.getenv("REDIS_URL")
+# Fernet key encrypting API keys of sessions stored in Redis, required with REDIS_URL
+SESSION_ENCRYPTION_KEY = os.getenv("SESSION_ENCRYPTION_KEY")
@@ -2,8 +2,14 @@
 Factory for creating LLM instances based on configuration.
 """
 
-from typing import Optional
+import asyncio
+import hashlib
+from functools import cached_property
+from typing import Callable, Dict, Optional, Type
 
+import anthropic
+import httpx
+from cachetools import LRUCache
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -17,6 +23,239 @@ from config import (
     GoogleConfig,
 )
 
+# Connection pool settings shared by all sessions of a provider, sized for
+# many concurrent streams since every session of a provider uses one pool
+HTTP_LIMITS = httpx.Limits(
+    max_connections=2000, max_keepalive_connections=1500, keepalive_expiry=30
+)
+# Provider request timeout; the SDKs override the HTTP client's own timeout,
+# so it is also passed to each chat model
+REQUEST_TIMEOUT = 120.0
+HTTP_TIMEOUT = httpx.Timeout(REQUEST_TIMEOUT)
+
+# Shared async HTTP clients by provider, created on first use
+_HTTP_CLIENTS: Dict[ModelProvider, httpx.AsyncClient] = {}
+
+# API base URLs of providers that use the shared HTTP clients
+PROVIDER_BASE_URLS = {
+    ModelProvider.OPENAI: "https://api.openai.com/v1/",
+    ModelProvider.ANTHROPIC: "https://api.anthropic.com/v1/",
+}
+
+
+def get_http_client(provider: ModelProvider) -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client for a provider, creating it if needed.
+
+    Args:
+        provider: Model provider
+
+    Returns:
+        An httpx async client with a keep-alive connection pool
+    """
+    client = _HTTP_CLIENTS.get(provider)
+    if client is None:
+        client = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+        _HTTP_CLIENTS[provider] = client
+    return client
+
+
+async def warm_http_clients():
+    """
+    Open pooled connections to each provider API ahead of the first request.
+
+    Responses are ignored, and failures only mean the first real request
+    pays the connection cost instead.
+    """
+    await asyncio.gather(
+        *(
+            get_http_client(provider).head(base_url, timeout=5.0)
+            for provider, base_url in PROVIDER_BASE_URLS.items()
+        ),
+        return_exceptions=True,
+    )
+
+
+async def close_http_clients():
+    """Close all shared HTTP clients."""
+    clients = list(_HTTP_CLIENTS.values())
+    _HTTP_CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
+
+
+async def close_llm(llm: BaseChatModel):
+    """
+    Close connections owned by an LLM instance itself.
+
+    OpenAI and Anthropic models send requests through the shared HTTP
+    clients, which are closed by close_http_clients() instead.
+
+    Args:
+        llm: LangChain chat model
+    """
+    if isinstance(llm, ChatGoogleGenerativeAI):
+        async_client = llm.async_client_running
+        if async_client is not None:
+            llm.async_client_running = None
+            await async_client.transport.close()
+
+
+class PooledChatAnthropic(ChatAnthropic):
+    """ChatAnthropic that sends async requests through the shared HTTP client."""
+
+    @cached_property
+    def _async_client(self) -> anthropic.AsyncClient:
+        return anthropic.AsyncClient(
+            **self._client_params,
+            http_client=get_http_client(ModelProvider.ANTHROPIC),
+        )
+
+
+class _APIKey:
+    """API key held only as a digest, so the raw key never stays in cache keys."""
+
+    __slots__ = ("digest",)
+
+    def __init__(self, value: Optional[str]):
+        self.digest = (
+            hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+            if value
+            else ""
+        )
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _APIKey) and self.digest == other.digest
+
+    def __repr__(self) -> str:
+        return f"_APIKey({self.digest[:8]})"
+
+
+# Conversations only call ainvoke/astream, which use the async clients below
+# (the Google model uses its grpc_asyncio client), so provider I/O never
+# blocks the event loop. The sync clients the integrations also construct
+# stay unused.
+
+
+def _build_openai(config: OpenAIConfig) -> BaseChatModel:
+    """Create an OpenAI chat model."""
+    return ChatOpenAI(
+        model=config.model_name,
+        openai_api_key=config.api_key,
+        http_async_client=get_http_client(ModelProvider.OPENAI),
+        timeout=REQUEST_TIMEOUT,
+        streaming=True,
+        temperature=0.7,
+    )
+
+
+def _build_anthropic(config: AnthropicConfig) -> BaseChatModel:
+    """Create an Anthropic chat model."""
+    return PooledChatAnthropic(
+        model=config.model_name,
+        anthropic_api_key=config.api_key,
+        default_request_timeout=REQUEST_TIMEOUT,
+        streaming=True,
+        temperature=0.7,
+    )
+
+
+def _build_google(config: GoogleConfig) -> BaseChatModel:
+    """Create a Google chat model."""
+    return ChatGoogleGenerativeAI(
+        model=config.model_name,
+        google_api_key=config.api_key,
+        temperature=0.7,
+    )
+
+
+# Configuration class and model builder by provider
+_CONFIG_CLASSES: Dict[ModelProvider, Type[ModelConfig]] = {
+    ModelProvider.OPENAI: OpenAIConfig,
+    ModelProvider.ANTHROPIC: AnthropicConfig,
+    ModelProvider.GOOGLE: GoogleConfig,
+}
+_BUILDERS: Dict[ModelProvider, Callable[[ModelConfig], BaseChatModel]] = {
+    ModelProvider.OPENAI: _build_openai,
+    ModelProvider.ANTHROPIC: _build_anthropic,
+    ModelProvider.GOOGLE: _build_google,
+}
+
+
+# Close tasks for evicted LLMs, referenced until they finish
+_closing_tasks = set()
+
+
+def _schedule_close(llm: BaseChatModel):
+    """Close an LLM instance in the background."""
+    task = asyncio.create_task(close_llm(llm))
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
+
+
+# Number of conversations using each LLM instance, by instance ID
+_LLM_USERS: Dict[int, int] = {}
+# Evicted LLM instances still in use, closed once their last user releases them
+_EVICTED_LLMS: Dict[int, BaseChatModel] = {}
+
+
+def retain_llm(llm: BaseChatModel):
+    """
+    Register a conversation using an LLM instance.
+
+    Args:
+        llm: LangChain chat model
+    """
+    _LLM_USERS[id(llm)] = _LLM_USERS.get(id(llm), 0) + 1
+
+
+async def release_llm(llm: BaseChatModel):
+    """
+    Unregister a conversation using an LLM instance.
+
+    The instance is closed if it was evicted from the cache and this was
+    its last user.
+
+    Args:
+        llm: LangChain chat model
+    """
+    users = _LLM_USERS.pop(id(llm), 0) - 1
+    if users > 0:
+        _LLM_USERS[id(llm)] = users
+    elif _EVICTED_LLMS.pop(id(llm), None) is not None:
+        await close_llm(llm)
+
+
+class LLMCache(LRUCache):
+    """LRU cache that closes LLM instances once they are evicted and unused."""
+
+    def popitem(self):
+        key, llm = super().popitem()
+        if id(llm) in _LLM_USERS:
+            _EVICTED_LLMS[id(llm)] = llm
+        else:
+            _schedule_close(llm)
+        return key, llm
+
+
+# Shared LLM instances by provider, model name, and API key
+_LLMS = LLMCache(maxsize=64)
+
+
+async def close_shared_llms():
+    """Close all shared LLM instances, including evicted ones still in use."""
+    llms = list(_LLMS.values()) + list(_EVICTED_LLMS.values())
+    # Removing keys directly skips the closing popitem()
+    for key in list(_LLMS):
+        del _LLMS[key]
+    _EVICTED_LLMS.clear()
+    for llm in llms:
+        await close_llm(llm)
+    await asyncio.gather(*_closing_tasks, return_exceptions=True)
+
 
 class LLMFactory:
     """Factory for creating LLM instances from configuration."""
@@ -35,40 +274,17 @@ class LLMFactory:
         Raises:
             ValueError: If the provider is not supported
         """
-        if config.provider == ModelProvider.OPENAI:
-            if not isinstance(config, OpenAIConfig):
-                raise ValueError("Expected OpenAIConfig for OpenAI provider")
-
-            return ChatOpenAI(
-                model=config.model_name,
-                openai_api_key=config.api_key,
-                streaming=True,
-                temperature=0.7,
-            )
-
-        elif config.provider == ModelProvider.ANTHROPIC:
-            if not isinstance(config, AnthropicConfig):
-                raise ValueError("Expected AnthropicConfig for Anthropic provider")
-
-            return ChatAnthropic(
-                model=config.model_name,
-                anthropic_api_key=config.api_key,
-                streaming=True,
-                temperature=0.7,
-            )
-
-        elif config.provider == ModelProvider.GOOGLE:
-            if not isinstance(config, GoogleConfig):
-                raise ValueError("Expected GoogleConfig for Google provider")
+        builder = _BUILDERS.get(config.provider)
+        if builder is None:
+            raise ValueError(f"Unsupported provider: {config.provider}")
 
-            return ChatGoogleGenerativeAI(
-                model=config.model_name,
-                google_api_key=config.api_key,
-                temperature=0.7,
+        config_class = _CONFIG_CLASSES[config.provider]
+        if not isinstance(config, config_class):
+            raise ValueError(
+                f"Expected {config_class.__name__} for {config.provider.value} provider"
             )
 
-        else:
-            raise ValueError(f"Unsupported provider: {config.provider}")
+        return builder(config)
 
     @staticmethod
     def create_from_params(
@@ -85,15 +301,34 @@ class LLMFactory:
         Returns:
             A LangChain chat model instance
         """
-        provider_enum = ModelProvider(provider)
-
-        if provider_enum == ModelProvider.OPENAI:
-            config = OpenAIConfig(model_name=model_name, api_key=api_key)
-        elif provider_enum == ModelProvider.ANTHROPIC:
-            config = AnthropicConfig(model_name=model_name, api_key=api_key)
-        elif provider_enum == ModelProvider.GOOGLE:
-            config = GoogleConfig(model_name=model_name, api_key=api_key)
-        else:
+        config_class = _CONFIG_CLASSES.get(ModelProvider(provider))
+        if config_class is None:
             raise ValueError(f"Unsupported provider: {provider}")
 
+        config = config_class(model_name=model_name, api_key=api_key)
         return LLMFactory.create_llm(config)
+
+    @staticmethod
+    def get_shared(
+        provider: str, model_name: str, api_key: Optional[str] = None
+    ) -> BaseChatModel:
+        """
+        Get a cached LLM instance for provider, model name, and API key.
+
+        Sessions configured with the same parameters share one instance and
+        therefore its connection pool.
+
+        Args:
+            provider: Model provider name
+            model_name: Model name
+            api_key: API key for the provider
+
+        Returns:
+            A LangChain chat model instance
+        """
+        key = (provider, model_name, _APIKey(api_key))
+        llm = _LLMS.get(key)
+        if llm is None:
+            llm = LLMFactory.create_from_params(provider, model_name, api_key)
+            _LLMS[key] = llm
+        return llm
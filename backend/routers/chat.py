@@ -1,19 +1,82 @@
 """
 FastAPI router for chat endpoints.
 """
+import asyncio
 from typing import Dict, List, Optional
+
+import orjson
+from cachetools import TTLCache
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
 from models.llm_factory import LLMFactory
 from services.conversation import ConversationService
-from config import ModelProvider, AVAILABLE_MODELS
+from services.session_store import create_session_store
+from config import (
+    ModelProvider,
+    AVAILABLE_MODELS,
+    MAX_SESSIONS,
+    SESSION_TTL_SECONDS,
+)
 
 router = APIRouter()
 
-# Dictionary to store conversation services by session ID
-conversation_services: Dict[str, ConversationService] = {}
+# Close tasks for evicted sessions, referenced until they finish
+_closing_tasks = set()
+
+def _schedule_close(service: ConversationService):
+    """Close a conversation service in the background."""
+    task = asyncio.create_task(service.close())
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
+
+class SessionCache(TTLCache):
+    """TTL cache that closes conversation services when they are evicted."""
+
+    def popitem(self):
+        key, service = super().popitem()
+        _schedule_close(service)
+        return key, service
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for _, service in expired:
+            _schedule_close(service)
+        return expired
+
+# Conversation services by session ID, bounded and expired after inactivity
+conversation_services = SessionCache(maxsize=MAX_SESSIONS, ttl=SESSION_TTL_SECONDS)
+conversation_services_lock = asyncio.Lock()
+
+# Shared store for session state across workers, None when Redis is not configured
+session_store = create_session_store()
+
+async def close_sessions():
+    """Close all conversation services."""
+    async with conversation_services_lock:
+        services = list(conversation_services.values())
+
+    for service in services:
+        await service.close()
+
+# Available models never change at runtime, so the response is built and serialized once
+_MODELS_RESPONSE = {
+    "providers": [provider.value for provider in ModelProvider],
+    "models": {provider.value: models for provider, models in AVAILABLE_MODELS.items()}
+}
+_MODELS_RESPONSE_BYTES = orjson.dumps(_MODELS_RESPONSE)
+
+# Streamed chunks are sent as one event once more than this many characters
+# are pending, and pending text is never held longer than this many seconds
+# after the last event
+STREAM_COALESCE_CHARS = 48
+STREAM_COALESCE_INTERVAL = 0.015
+
+# Server-sent event framing
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_SSE_DONE = _SSE_PREFIX + b"[DONE]" + _SSE_SUFFIX
 
 class MessageRequest(BaseModel):
     """Request model for chat messages."""
@@ -37,7 +100,7 @@ class ModelsResponse(BaseModel):
     providers: List[str]
     models: Dict[str, List[str]]
 
-@router.get("/models", response_model=ModelsResponse)
+@router.get("/models", responses={200: {"model": ModelsResponse}})
 async def get_available_models():
     """
     Get available model providers and models.
@@ -45,12 +108,9 @@ async def get_available_models():
     Returns:
         Dictionary with providers and models
     """
-    return {
-        "providers": [provider.value for provider in ModelProvider],
-        "models": {provider.value: models for provider, models in AVAILABLE_MODELS.items()}
-    }
+    return Response(content=_MODELS_RESPONSE_BYTES, media_type="application/json")
 
-@router.post("/configure", response_model=Dict)
+@router.post("/configure")
 async def configure_model(config: ModelConfigRequest):
     """
     Configure the model for a session.
@@ -62,21 +122,94 @@ async def configure_model(config: ModelConfigRequest):
         Status message
     """
     try:
-        # Create LLM based on the configuration
-        llm = LLMFactory.create_from_params(
+        # Get a shared LLM for the configuration
+        llm = LLMFactory.get_shared(
             provider=config.provider,
             model_name=config.model_name,
             api_key=config.api_key
         )
         
+        # Stop the previous service before its history is replaced
+        async with conversation_services_lock:
+            previous = conversation_services.pop(config.session_id, None)
+        if previous is not None:
+            await previous.close()
+        
+        # Share the configuration with other workers
+        config_version = None
+        if session_store is not None:
+            config_version = await session_store.save_config(
+                config.session_id,
+                {
+                    "provider": config.provider,
+                    "model_name": config.model_name,
+                    "api_key": config.api_key,
+                },
+            )
+        
         # Create or update the conversation service
-        conversation_services[config.session_id] = ConversationService(llm=llm)
+        async with conversation_services_lock:
+            conversation_services[config.session_id] = ConversationService(
+                llm=llm,
+                store=session_store,
+                session_id=config.session_id,
+                config_version=config_version,
+            )
         
         return {"status": "success", "message": f"Configured {config.provider} model: {config.model_name}"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error configuring model: {str(e)}")
 
-def get_conversation_service(session_id: str) -> ConversationService:
+async def _sync_conversation_service(
+    session_id: str, conversation: Optional[ConversationService]
+) -> Optional[ConversationService]:
+    """
+    Match the local conversation service with the configuration in the store.
+    
+    The session may have been configured or reconfigured by another worker,
+    in which case the local service is replaced.
+    
+    Args:
+        session_id: Session ID
+        conversation: Local conversation service, if any
+        
+    Returns:
+        Conversation service, or None if the session is not in the store
+    """
+    config = await session_store.load_config(session_id)
+    if config is not None and conversation is not None:
+        if conversation.config_version == config["version"]:
+            return conversation
+    
+    replacement = None
+    if config is not None:
+        version = config.pop("version")
+        replacement = ConversationService(
+            llm=LLMFactory.get_shared(**config),
+            store=session_store,
+            session_id=session_id,
+            config_version=version,
+        )
+        await replacement.load_history()
+    
+    async with conversation_services_lock:
+        current = conversation_services.get(session_id)
+        if current is not None and current is not conversation:
+            # A concurrent request replaced or reconfigured it first
+            stale, conversation = replacement, current
+        else:
+            stale = conversation
+            conversation_services.pop(session_id, None)
+            if replacement is not None:
+                conversation_services[session_id] = replacement
+            conversation = replacement
+    
+    if stale is not None:
+        await stale.close()
+    
+    return conversation
+
+async def get_conversation_service(session_id: str) -> ConversationService:
     """
     Get the conversation service for a session.
     
@@ -89,15 +222,24 @@ def get_conversation_service(session_id: str) -> ConversationService:
     Raises:
         HTTPException: If the session is not configured
     """
-    if session_id not in conversation_services:
+    async with conversation_services_lock:
+        conversation = conversation_services.get(session_id)
+        if conversation is not None:
+            # Re-insert to restart the session's time to live
+            conversation_services[session_id] = conversation
+
+    if session_store is not None:
+        conversation = await _sync_conversation_service(session_id, conversation)
+
+    if conversation is None:
         raise HTTPException(
             status_code=400, 
             detail="Session not configured. Please configure a model first."
         )
     
-    return conversation_services[session_id]
+    return conversation
 
-@router.post("/chat", response_model=MessageResponse)
+@router.post("/chat", responses={200: {"model": MessageResponse}})
 async def chat(request: MessageRequest):
     """
     Generate a response to a chat message.
@@ -108,10 +250,13 @@ async def chat(request: MessageRequest):
     Returns:
         Response message
     """
-    conversation = get_conversation_service(request.session_id)
+    conversation = await get_conversation_service(request.session_id)
+    
+    # Interrupt a response still streaming for the previous message
+    await conversation.cancel_active_response()
     
     # Add the user message to the conversation
-    conversation.add_user_message(request.message)
+    await conversation.add_user_message(request.message)
     
     # Generate a response
     response = await conversation.generate_response()
@@ -129,23 +274,75 @@ async def chat_stream(request: MessageRequest):
     Returns:
         Streaming response
     """
-    conversation = get_conversation_service(request.session_id)
+    conversation = await get_conversation_service(request.session_id)
+    
+    # Interrupt a response still streaming for the previous message
+    await conversation.cancel_active_response()
     
     # Add the user message to the conversation
-    conversation.add_user_message(request.message)
+    await conversation.add_user_message(request.message)
     
     # Create a streaming response
     async def stream_generator():
-        async for chunk in conversation.generate_response_stream():
-            yield f"data: {chunk}\n\n"
-        yield "data: [DONE]\n\n"
+        loop = asyncio.get_running_loop()
+        chunks = conversation.generate_response_stream()
+        buf: List[str] = []
+        buffered = 0
+        last_emit = loop.time()
+        # The next chunk is awaited in a task of its own, so pending text can
+        # be flushed on a deadline without cancelling the response stream
+        pending = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(chunks.__anext__())
+                timeout = (
+                    max(0.0, last_emit + STREAM_COALESCE_INTERVAL - loop.time())
+                    if buf
+                    else None
+                )
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+                if done:
+                    try:
+                        chunk = pending.result()
+                    except StopAsyncIteration:
+                        pending = None
+                        break
+                    pending = None
+                    buf.append(chunk)
+                    buffered += len(chunk)
+                    # Coalesce bursts of small chunks into a single event
+                    if (
+                        buffered <= STREAM_COALESCE_CHARS
+                        and loop.time() - last_emit < STREAM_COALESCE_INTERVAL
+                    ):
+                        continue
+                yield _SSE_PREFIX + orjson.dumps({"t": "".join(buf)}) + _SSE_SUFFIX
+                buf = []
+                buffered = 0
+                last_emit = loop.time()
+            if buf:
+                yield _SSE_PREFIX + orjson.dumps({"t": "".join(buf)}) + _SSE_SUFFIX
+            yield _SSE_DONE
+        finally:
+            # Stop the response when the client goes away mid-stream
+            if pending is not None:
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+            await chunks.aclose()
     
     return StreamingResponse(
         stream_generator(),
-        media_type="text/event-stream"
+        media_type="text/event-stream",
+        # Keep proxies and compression middleware from buffering the stream
+        headers={
+            "Cache-Control": "no-cache",
+            "Content-Encoding": "identity",
+            "X-Accel-Buffering": "no",
+        }
     )
 
-@router.post("/reset", response_model=Dict)
+@router.post("/reset")
 async def reset_conversation(request: MessageRequest):
     """
     Reset a conversation.
@@ -156,7 +353,8 @@ async def reset_conversation(request: MessageRequest):
     Returns:
         Status message
     """
-    conversation = get_conversation_service(request.session_id)
-    conversation.reset_conversation()
+    conversation = await get_conversation_service(request.session_id)
+    await conversation.cancel_active_response()
+    await conversation.reset_conversation()
     
     return {"status": "success", "message": "Conversation reset"}
\ No newline at end of file
@@ -2,51 +2,161 @@
 Service for managing conversations with LLMs.
 """
 
+import asyncio
+from functools import partial
 from typing import Dict, List, Optional, AsyncGenerator
 
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+)
 from langchain_core.language_models.chat_models import BaseChatModel
 
-from config import DEFAULT_SYSTEM_PROMPT
+from config import DEFAULT_SYSTEM_PROMPT, MAX_CONVERSATION_TURNS
+from models.llm_factory import release_llm, retain_llm
+from services.session_store import SessionStore
+
+# Maximum response chunks buffered between the LLM and the client
+STREAM_QUEUE_SIZE = 32
+
+# API role names by LangChain message type
+MESSAGE_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+# LangChain message classes by API role name
+ROLE_MESSAGES = {
+    "system": SystemMessage,
+    "user": HumanMessage,
+    "assistant": AIMessage,
+}
 
 
 class ConversationService:
     """Service for managing conversations with LLMs."""
 
-    def __init__(self, llm: BaseChatModel, system_prompt: str = DEFAULT_SYSTEM_PROMPT):
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+        max_turns: int = MAX_CONVERSATION_TURNS,
+        store: Optional[SessionStore] = None,
+        session_id: Optional[str] = None,
+        config_version: Optional[str] = None,
+    ):
         """
         Initialize the conversation service.
 
         Args:
             llm: LangChain chat model
             system_prompt: System prompt for the conversation
+            max_turns: Number of most recent turns kept in the conversation
+            store: Shared session store holding the message history, if any
+            session_id: Session ID of the conversation in the store
+            config_version: Version of the stored session configuration
         """
         self.llm = llm
         self.system_prompt = system_prompt
-        self.messages: List[Dict] = []
+        self.max_turns = max_turns
+        self.store = store
+        self.session_id = session_id
+        self.config_version = config_version
+        self.messages: List[BaseMessage] = []
+        self._active_task: Optional[asyncio.Task] = None
+        self._closed = False
+        retain_llm(llm)
         self._initialize_conversation()
 
     def _initialize_conversation(self):
         """Initialize the conversation with a system prompt."""
-        self.messages = [{"role": "system", "content": self.system_prompt}]
+        self.messages = [SystemMessage(content=self.system_prompt)]
+
+    async def load_history(self):
+        """Load the message history from the session store, if any."""
+        if self.store is not None:
+            self._set_history(
+                await self.store.load_messages(self.session_id, self.config_version)
+            )
 
-    def add_user_message(self, content: str):
+    def _set_history(self, history: List[Dict]):
+        """
+        Replace the conversation after the system prompt with stored messages.
+
+        Args:
+            history: List of message dictionaries
+        """
+        self._initialize_conversation()
+        self.messages.extend(
+            ROLE_MESSAGES[message["role"]](content=message["content"])
+            for message in history
+        )
+
+    async def _add_message(self, message: BaseMessage):
+        """
+        Append a message to the conversation and the session store.
+
+        Args:
+            message: LangChain message
+        """
+        # A closed or replaced conversation must not touch the session's history
+        if self._closed:
+            return
+
+        if self.store is None:
+            self.messages.append(message)
+            return
+
+        # The stored history also has turns served by other workers
+        history = await self.store.append_messages(
+            self.session_id,
+            self.config_version,
+            [{"role": MESSAGE_ROLES[message.type], "content": message.content}],
+        )
+        self._set_history(history)
+
+    async def add_user_message(self, content: str):
         """
         Add a user message to the conversation.
 
         Args:
             content: Message content
         """
-        self.messages.append({"role": "user", "content": content})
+        await self._add_message(HumanMessage(content=content))
 
-    def add_assistant_message(self, content: str):
+    async def add_assistant_message(self, content: str):
         """
         Add an assistant message to the conversation.
 
         Args:
             content: Message content
         """
-        self.messages.append({"role": "assistant", "content": content})
+        await self._add_message(AIMessage(content=content))
+        if self._trim_history() and self.store is not None:
+            await self.store.trim_messages(
+                self.session_id, self.config_version, len(self.messages) - 1
+            )
+
+    def _trim_history(self) -> bool:
+        """
+        Drop the oldest turns beyond max_turns, keeping the system prompt.
+
+        Returns:
+            Whether any messages were dropped
+        """
+        excess = len(self.messages) - (1 + 2 * self.max_turns)
+        if excess <= 0:
+            return False
+
+        # Interrupted turns can leave unpaired messages, so make sure the
+        # remaining history still starts with a user message
+        while (
+            1 + excess < len(self.messages)
+            and self.messages[1 + excess].type != "human"
+        ):
+            excess += 1
+
+        del self.messages[1 : 1 + excess]
+        return True
 
     def get_messages(self) -> List[Dict]:
         """
@@ -55,62 +165,163 @@ class ConversationService:
         Returns:
             List of message dictionaries
         """
-        return self.messages
+        return [
+            {"role": MESSAGE_ROLES[message.type], "content": message.content}
+            for message in self.messages
+        ]
 
-    def reset_conversation(self):
+    async def reset_conversation(self):
         """Reset the conversation."""
         self._initialize_conversation()
+        if self.store is not None and not self._closed:
+            await self.store.clear_messages(self.session_id, self.config_version)
 
-    def _convert_to_langchain_messages(self):
+    async def close(self):
         """
-        Convert the messages to LangChain format.
+        Release resources held by the conversation.
 
-        Returns:
-            List of LangChain message objects
+        The shared LLM is released, and closed if it was evicted and no
+        other conversation uses it. Stored history is kept for other
+        workers. A closed conversation no longer writes to the session store.
         """
-        lc_messages = []
-
-        for message in self.messages:
-            if message["role"] == "system":
-                lc_messages.append(SystemMessage(content=message["content"]))
-            elif message["role"] == "user":
-                lc_messages.append(HumanMessage(content=message["content"]))
-            elif message["role"] == "assistant":
-                lc_messages.append(AIMessage(content=message["content"]))
+        if self._closed:
+            return
+        self._closed = True
+        await self.cancel_active_response()
+        self.messages = []
+        await release_llm(self.llm)
 
-        return lc_messages
+    async def cancel_active_response(self):
+        """Cancel the in-flight streaming response, if any, and wait for it to stop."""
+        task = self._active_task
+        self._active_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
 
-    async def generate_response(self) -> str:
+    async def _invoke(self) -> str:
         """
-        Generate a response from the LLM.
+        Get the complete LLM response and add it to the conversation.
 
         Returns:
             Response text
         """
-        lc_messages = self._convert_to_langchain_messages()
-        response = await self.llm.ainvoke(lc_messages)
+        response = await self.llm.ainvoke(self.messages)
         response_text = response.content
 
         # Add the response to the conversation
-        self.add_assistant_message(response_text)
+        await self.add_assistant_message(response_text)
 
         return response_text
 
+    async def generate_response(self) -> str:
+        """
+        Generate a response from the LLM.
+
+        The response runs in a task of its own, so a newer message can
+        interrupt it through cancel_active_response().
+
+        Returns:
+            Response text, or an empty string if a newer message interrupted it
+        """
+        await self.cancel_active_response()
+
+        task = asyncio.create_task(self._invoke())
+        self._active_task = task
+
+        try:
+            await asyncio.wait({task})
+        finally:
+            # Stop generating when the client goes away
+            if not task.done():
+                task.cancel()
+
+        if task.cancelled():
+            return ""
+        return task.result()
+
+    async def _stream_to_queue(self, queue: asyncio.Queue, delivered: List[str]):
+        """
+        Stream the LLM response into a queue and add it to the conversation.
+
+        Chunks are followed by None when the stream ends, or by the exception
+        that stopped it. Cancellation is handled by _end_interrupted_stream.
+
+        Args:
+            queue: Queue receiving the response text chunks
+            delivered: Chunks the reader has passed on to the client
+        """
+        parts: List[str] = []
+
+        try:
+            async for chunk in self.llm.astream(self.messages):
+                # Message chunks always have content, often empty
+                chunk_text = chunk.content
+                if not chunk_text:
+                    continue
+                parts.append(chunk_text)
+                await queue.put(chunk_text)
+        except asyncio.CancelledError:
+            # Keep the partial response the client received so the history
+            # stays in turn order; queued chunks are dropped with the stream
+            partial_text = "".join(delivered)
+            if partial_text:
+                await self.add_assistant_message(partial_text)
+            raise
+        except Exception as e:
+            await queue.put(e)
+            return
+
+        # Add the complete response to the conversation
+        await self.add_assistant_message("".join(parts))
+        await queue.put(None)
+
+    @staticmethod
+    def _end_interrupted_stream(queue: asyncio.Queue, task: asyncio.Task):
+        """
+        Post the end marker for a cancelled stream task.
+
+        Runs as a done callback, so it also covers tasks cancelled before
+        they started running.
+
+        Args:
+            queue: Queue read by the stream reader
+            task: Finished stream task
+        """
+        if task.cancelled():
+            # The interrupted reader only needs the end marker
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
     async def generate_response_stream(self) -> AsyncGenerator[str, None]:
         """
         Generate a streaming response from the LLM.
 
+        The response runs in a task of its own, so a newer message can
+        interrupt it through cancel_active_response().
+
         Yields:
             Response text chunks
         """
-        lc_messages = self._convert_to_langchain_messages()
-        response_text = ""
+        await self.cancel_active_response()
 
-        async for chunk in self.llm.astream(lc_messages):
-            if hasattr(chunk, "content"):
-                chunk_text = chunk.content
-                response_text += chunk_text
-                yield chunk_text
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        delivered: List[str] = []
+        task = asyncio.create_task(self._stream_to_queue(queue, delivered))
+        task.add_done_callback(partial(self._end_interrupted_stream, queue))
+        self._active_task = task
 
-        # Add the complete response to the conversation
-        self.add_assistant_message(response_text)
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                delivered.append(chunk)
+                yield chunk
+        finally:
+            # Stop generating when the client goes away mid-stream
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,180 @@
+"""
+Redis-backed storage for conversation sessions shared between workers.
+"""
+
+import uuid
+from typing import Dict, List, Optional
+
+import orjson
+from cryptography.fernet import Fernet, InvalidToken
+from redis.asyncio import Redis
+
+from config import REDIS_URL, SESSION_ENCRYPTION_KEY, SESSION_TTL_SECONDS
+
+
+class SessionStore:
+    """
+    Store for session model configuration and message history in Redis.
+
+    Each configuration of a session gets a new version, and its history is
+    kept under that version. Services still holding an older configuration
+    therefore never write into the history of the current one. API keys
+    are only stored encrypted.
+    """
+
+    def __init__(self, redis: Redis, cipher: Fernet, ttl: int = SESSION_TTL_SECONDS):
+        """
+        Initialize the session store.
+
+        Args:
+            redis: Async Redis client
+            cipher: Cipher encrypting the API keys of stored configurations
+            ttl: Seconds a session is kept after its last update
+        """
+        self.redis = redis
+        self.cipher = cipher
+        self.ttl = ttl
+
+    @staticmethod
+    def _messages_key(session_id: str, version: str) -> str:
+        return f"conv:{session_id}:{version}"
+
+    @staticmethod
+    def _config_key(session_id: str) -> str:
+        return f"conv:{session_id}:config"
+
+    async def save_config(self, session_id: str, config: Dict[str, str]) -> str:
+        """
+        Save a new model configuration for a session, starting an empty history.
+
+        Args:
+            session_id: Session ID
+            config: Provider, model name, and API key of the session
+
+        Returns:
+            Version of the saved configuration
+        """
+        previous = await self.load_config(session_id)
+        version = uuid.uuid4().hex
+
+        stored = {**config, "version": version}
+        if stored.get("api_key"):
+            stored["api_key"] = self.cipher.encrypt(
+                stored["api_key"].encode("utf-8")
+            ).decode("ascii")
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._config_key(session_id), orjson.dumps(stored), ex=self.ttl)
+            if previous is not None:
+                pipe.delete(self._messages_key(session_id, previous["version"]))
+            await pipe.execute()
+
+        return version
+
+    async def load_config(self, session_id: str) -> Optional[Dict[str, str]]:
+        """
+        Load the model configuration of a session.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Configuration dictionary including its version, or None if the
+            session is not configured or its API key cannot be decrypted
+        """
+        value = await self.redis.get(self._config_key(session_id))
+        if value is None:
+            return None
+
+        config = orjson.loads(value)
+        if config.get("api_key"):
+            try:
+                config["api_key"] = self.cipher.decrypt(
+                    config["api_key"].encode("ascii")
+                ).decode("utf-8")
+            except InvalidToken:
+                # Saved under another encryption key, so it must be reconfigured
+                return None
+        return config
+
+    async def load_messages(self, session_id: str, version: str) -> List[Dict]:
+        """
+        Load the message history of a session configuration.
+
+        Args:
+            session_id: Session ID
+            version: Configuration version
+
+        Returns:
+            List of message dictionaries
+        """
+        values = await self.redis.lrange(
+            self._messages_key(session_id, version), 0, -1
+        )
+        return [orjson.loads(value) for value in values]
+
+    async def append_messages(
+        self, session_id: str, version: str, messages: List[Dict]
+    ) -> List[Dict]:
+        """
+        Append messages to the history of a session and refresh its TTL.
+
+        Args:
+            session_id: Session ID
+            version: Configuration version
+            messages: Message dictionaries to append
+
+        Returns:
+            The full message history after appending, including messages
+            added by other workers
+        """
+        key = self._messages_key(session_id, version)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *(orjson.dumps(message) for message in messages))
+            pipe.lrange(key, 0, -1)
+            pipe.expire(key, self.ttl)
+            pipe.expire(self._config_key(session_id), self.ttl)
+            _, values, _, _ = await pipe.execute()
+        return [orjson.loads(value) for value in values]
+
+    async def trim_messages(self, session_id: str, version: str, keep: int):
+        """
+        Keep only the newest messages of a session.
+
+        Args:
+            session_id: Session ID
+            version: Configuration version
+            keep: Number of messages to keep
+        """
+        await self.redis.ltrim(self._messages_key(session_id, version), -keep, -1)
+
+    async def clear_messages(self, session_id: str, version: str):
+        """
+        Clear the message history of a session.
+
+        Args:
+            session_id: Session ID
+            version: Configuration version
+        """
+        await self.redis.delete(self._messages_key(session_id, version))
+
+    async def close(self):
+        """Close the Redis connection pool."""
+        await self.redis.aclose()
+
+
+def create_session_store() -> Optional[SessionStore]:
+    """
+    Create the session store if Redis is configured.
+
+    Returns:
+        A session store, or None when REDIS_URL is not set
+
+    Raises:
+        ValueError: If REDIS_URL is set without SESSION_ENCRYPTION_KEY
+    """
+    if not REDIS_URL:
+        return None
+    if not SESSION_ENCRYPTION_KEY:
+        raise ValueError("SESSION_ENCRYPTION_KEY must be set when REDIS_URL is set")
+    return SessionStore(Redis.from_url(REDIS_URL), Fernet(SESSION_ENCRYPTION_KEY))
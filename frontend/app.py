@@ -3,7 +3,7 @@ Gradio UI for the conversational AI application.
 """
 
 import uuid
-import requests
+import httpx
 import json
 import gradio as gr
 import time
@@ -11,6 +11,12 @@ import time
 # Backend API URL
 API_URL = "http://localhost:8000/api"
 
+# Shared HTTP client so UI calls reuse keep-alive connections to the backend
+_SESSION = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+    timeout=60.0,
+)
+
 
 def get_session_id():
     """Generate a unique session ID."""
@@ -20,7 +26,7 @@ def get_session_id():
 def fetch_available_models():
     """Fetch available models from the API."""
     try:
-        response = requests.get(f"{API_URL}/models")
+        response = _SESSION.get(f"{API_URL}/models")
         data = response.json()
         return data["providers"], data["models"]
     except Exception as e:
@@ -31,7 +37,7 @@ def fetch_available_models():
 def configure_model(session_id, provider, model_name, api_key):
     """Configure the model for the session."""
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_URL}/configure",
             json={
                 "session_id": session_id,
@@ -58,7 +64,7 @@ def chat(session_id, message, chat_history):
 
     try:
         # Send request to API (non-streaming)
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_URL}/chat", json={"session_id": session_id, "message": message}
         )
 
@@ -87,28 +93,31 @@ def chat_stream(session_id, message, chat_history):
 
     try:
         # Send request to API (streaming)
-        response = requests.post(
+        with _SESSION.stream(
+            "POST",
             f"{API_URL}/chat/stream",
             json={"session_id": session_id, "message": message},
-            stream=True,
-        )
-
-        if response.status_code == 200:
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode("utf-8")
-                    if line.startswith("data: "):
-                        content = line[6:]
-                        if content == "[DONE]":
-                            break
-                        full_response += content
-                        # Update the last message in chat history with the partial response
-                        chat_history[-1] = (message, full_response)
-                        yield "", chat_history
-        else:
-            error_message = f"Error: {response.text}"
-            chat_history[-1] = (message, error_message)
-            yield "", chat_history
+        ) as response:
+            if response.status_code == 200:
+                # The backend already coalesces chunks into events, so each
+                # event is shown right away rather than held for the next one
+                for line in response.iter_lines():
+                    if line:
+                        if line.startswith("data: "):
+                            content = line[6:]
+                            if content == "[DONE]":
+                                break
+                            full_response += json.loads(content)["t"]
+                            # Update the last message in chat history with the partial response
+                            chat_history[-1] = (message, full_response)
+                            yield "", chat_history
+                if not full_response:
+                    yield "", chat_history
+            else:
+                response.read()
+                error_message = f"Error: {response.text}"
+                chat_history[-1] = (message, error_message)
+                yield "", chat_history
 
     except Exception as e:
         chat_history[-1] = (message, f"Error: {str(e)}")
@@ -121,7 +130,7 @@ def reset_conversation(session_id, chat_history):
         return "Please configure a model first.", chat_history
 
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_URL}/reset", json={"session_id": session_id, "message": ""}
         )
         if response.status_code == 200: